@@ -1,19 +1,28 @@
 """Authentication API endpoints."""
+import asyncio
 import logging
 
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
 from src.database import get_session
 from src.models.user import User
 from src.schemas.auth import AuthResponse, UserLogin, UserRegister, UserResponse
-from src.utils.jwt import create_access_token
+from src.utils.jwt import create_access_token, decode_token, invalidate_user_cache
 from src.utils.security import hash_password, verify_password
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 logger = logging.getLogger(__name__)
 
+# Verified against when the email is unknown so login always pays the same
+# bcrypt cost - otherwise missing emails return measurably faster than
+# wrong passwords (an enumeration timing oracle)
+_DUMMY_HASH = hash_password("x" * 16)
+
 
 @router.post("/register", response_model=AuthResponse, status_code=status.HTTP_201_CREATED)
 async def register(
@@ -32,21 +41,22 @@ async def register(
     Raises:
         HTTPException: If email already exists
     """
-    logger.info(f"Registration attempt for email: {user_data.email}")
+    logger.info("Registration attempt for email: %s", user_data.email)
 
     # Check if email already exists
     result = await session.execute(select(User).where(User.email == user_data.email))
     existing_user = result.scalar_one_or_none()
 
     if existing_user:
-        logger.warning(f"Registration failed - email already exists: {user_data.email}")
+        logger.warning("Registration failed - email already exists: %s", user_data.email)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
         )
     
-    # Hash password and create user
-    hashed_password = hash_password(user_data.password)
+    # Hash password off the event loop - bcrypt blocks for ~50-100ms
+    loop = asyncio.get_running_loop()
+    hashed_password = await loop.run_in_executor(None, hash_password, user_data.password)
     new_user = User(
         email=user_data.email,
         hashed_password=hashed_password,
@@ -56,15 +66,19 @@ async def register(
     await session.commit()
     await session.refresh(new_user)
 
-    logger.info(f"User registered successfully: {new_user.email} (ID: {new_user.id})")
+    logger.info("User registered successfully: %s (ID: %s)", new_user.email, new_user.id)
 
-    # Generate JWT token
-    # access_token = create_access_token(data={"sub": new_user.id})
-    access_token = create_access_token(data={"sub": str(new_user.id)}) # str() add karein
+    # Generate JWT token carrying the user's current token version
+    access_token = create_access_token(
+        data={"sub": str(new_user.id), "ver": new_user.jwt_version}
+    )
+    # DB-sourced values need no revalidation; construct directly
     return AuthResponse(
         access_token=access_token,
         token_type="bearer",
-        user=UserResponse.model_validate(new_user),
+        user=UserResponse.model_construct(
+            id=new_user.id, email=new_user.email, created_at=new_user.created_at
+        ),
     )
 
 
@@ -85,41 +99,67 @@ async def login(
     Raises:
         HTTPException: If credentials are invalid
     """
-    logger.info(f"Login attempt for email: {credentials.email}")
+    logger.info("Login attempt for email: %s", credentials.email)
 
     # Find user by email
     result = await session.execute(select(User).where(User.email == credentials.email))
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(credentials.password, user.hashed_password):
-        logger.warning(f"Login failed - invalid credentials for email: {credentials.email}")
+    # Verify password off the event loop - bcrypt blocks for ~50-100ms.
+    # A dummy hash is checked when the user is missing so rejection timing
+    # does not reveal whether the email exists.
+    loop = asyncio.get_running_loop()
+    password_hash = user.hashed_password if user is not None else _DUMMY_HASH
+    password_valid = await loop.run_in_executor(
+        None, verify_password, credentials.password, password_hash
+    )
+
+    if user is None or not password_valid:
+        logger.warning("Login failed - invalid credentials for email: %s", credentials.email)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    logger.info(f"User logged in successfully: {user.email} (ID: {user.id})")
+    logger.info("User logged in successfully: %s (ID: %s)", user.email, user.id)
 
-    # Generate JWT token
-    # access_token = create_access_token(data={"sub": user.id})
-    
-    access_token = create_access_token(data={"sub": str(user.id)}) # str() add karein
+    # Generate JWT token carrying the user's current token version
+    access_token = create_access_token(
+        data={"sub": str(user.id), "ver": user.jwt_version}
+    )
+    # DB-sourced values need no revalidation; construct directly
     return AuthResponse(
         access_token=access_token,
         token_type="bearer",
-        user=UserResponse.model_validate(user),
+        user=UserResponse.model_construct(
+            id=user.id, email=user.email, created_at=user.created_at
+        ),
     )
 
 
 @router.post("/logout", status_code=status.HTTP_200_OK)
-async def logout():
+async def logout(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
+):
     """Logout endpoint (informational only).
-    
+
     JWT tokens are stateless, so logout is handled client-side by removing the token.
     This endpoint exists for API completeness and can be used for logging/analytics.
-    
+    When a valid token is provided, the server-side user cache entry is invalidated.
+
     Returns:
         Success message
     """
+    if credentials is not None:
+        try:
+            payload = decode_token(credentials.credentials)
+            user_id = int(payload.get("sub"))
+        except (HTTPException, TypeError, ValueError):
+            # Invalid/expired token or unusable subject - nothing to
+            # invalidate, logout still succeeds
+            user_id = None
+        if user_id is not None:
+            await invalidate_user_cache(user_id)
+
     return {"message": "Successfully logged out. Please remove the token from client storage."}
@@ -1,131 +1,312 @@
 """Task management API endpoints."""
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import delete, func, insert, lambda_stmt, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
 from sqlmodel import select
 
-from src.database import get_session
+from src.database import get_conn, get_session
 from src.models.task import Task
-from src.models.user import User
 from src.schemas.task import TaskCreate, TaskList, TaskResponse, TaskUpdate
-from src.utils.jwt import get_current_user
+from src.utils.jwt import get_current_user_id
+from src.utils.time import utcnow
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 logger = logging.getLogger(__name__)
 
+# Response-shaped projection shared by the read paths
+_TASK_COLUMNS = (
+    Task.id,
+    Task.user_id,
+    Task.title,
+    Task.description,
+    Task.is_completed,
+    Task.created_at,
+    Task.updated_at,
+)
+
+
+async def _raise_not_found_or_forbidden(
+    session: Union[AsyncSession, AsyncConnection],
+    task_id: int,
+    current_user_id: int,
+    action: str,
+) -> None:
+    """Distinguish 404 from 403 after a combined id+owner query matched nothing.
+
+    Args:
+        session: Database session or Core connection
+        task_id: Task ID that was targeted
+        current_user_id: Id of the authenticated user
+        action: Verb used in logs and error messages (e.g. "update")
+
+    Raises:
+        HTTPException: 404 if task not found, 403 if owned by another user
+    """
+    result = await session.execute(select(Task.user_id).where(Task.id == task_id))
+    owner_id = result.scalar_one_or_none()
+
+    if owner_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found",
+        )
+
+    logger.warning(
+        "Authorization failed: user %s attempted to %s task %s owned by user %s",
+        current_user_id,
+        action,
+        task_id,
+        owner_id,
+    )
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail=f"Not authorized to {action} this task",
+    )
+
+
+def _task_etag(task_id: int, updated_at: datetime) -> str:
+    """Weak ETag for a task: changes exactly when the row is updated."""
+    return f'W/"{task_id}-{updated_at.isoformat()}"'
+
+
+# Ids beyond the signed-64-bit range parse fine in Python but overflow at
+# bind time, so they are rejected up front like any other malformed cursor
+_MAX_CURSOR_ID = 2**63 - 1
+
+
+def _parse_cursor(cursor: str) -> tuple:
+    """Split an opaque '<created_at>|<id>' cursor into its typed parts.
+
+    Raises:
+        HTTPException: 422 if the cursor is malformed or its id falls
+            outside the database's integer range
+    """
+    try:
+        created_at_part, _, id_part = cursor.partition("|")
+        created_at = datetime.fromisoformat(created_at_part)
+        cursor_id = int(id_part)
+        if not 0 <= cursor_id <= _MAX_CURSOR_ID:
+            raise ValueError("cursor id out of range")
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Invalid cursor",
+        )
+    # fromisoformat accepts timezone-aware values, but created_at binds to
+    # a TIMESTAMP WITHOUT TIME ZONE column; normalize to naive UTC so such
+    # cursors compare correctly instead of failing at bind time
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return created_at, cursor_id
+
 
 @router.get("", response_model=TaskList)
 async def get_tasks(
-    current_user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
+    limit: int = Query(50, ge=1, le=200, description="Maximum tasks per page"),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor value from the previous page"
+    ),
+    if_none_match: Optional[str] = Header(None),
+    current_user_id: int = Depends(get_current_user_id),
+    conn: AsyncConnection = Depends(get_conn),
 ):
-    """Get all tasks for the authenticated user.
-    
+    """Get the authenticated user's tasks, newest first, keyset-paginated.
+
     Args:
-        current_user: Authenticated user from JWT token
-        session: Database session
-        
+        limit: Maximum number of tasks to return per page
+        cursor: Opaque cursor from the previous page's next_cursor (exclusive)
+        if_none_match: ETag from a previous response, for conditional GET
+        current_user_id: Id of the authenticated user, straight from the token
+        conn: Read-only Core connection
+
     Returns:
-        TaskList with all user's tasks ordered by created_at descending
+        TaskList page with next_cursor set when more tasks remain, or 304
+        when the client's ETag is still current
     """
-    # Query tasks for current user, ordered by created_at desc
-    result = await session.execute(
-        select(Task)
-        .where(Task.user_id == current_user.id)
-        .order_by(Task.created_at.desc())
+    # One index-only aggregate gives both the page-independent total and a
+    # freshness marker: any create/update/delete by this user moves either
+    # the count or MAX(updated_at). On an ETag match the page query and all
+    # serialization are skipped entirely.
+    total, last_modified = (
+        await conn.execute(
+            lambda_stmt(
+                lambda: select(func.count(), func.max(Task.updated_at))
+                .select_from(Task)
+                .where(Task.user_id == current_user_id)
+            )
+        )
+    ).one()
+    etag = f'W/"{total}-{last_modified.isoformat() if last_modified else 0}"'
+    if if_none_match == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    # Keyset pagination over the (user_id, created_at DESC, id DESC) index:
+    # a pure index range scan with bounded memory, no OFFSET penalty. The id
+    # tiebreaker makes the ordering total, so pages neither skip nor repeat
+    # rows when several tasks share a created_at. Column projection skips
+    # ORM object construction; rows already match the response schema, so
+    # they are serialized directly with orjson. lambda_stmt caches the
+    # compiled SQL across requests - only the bound values change per call.
+    # Fetch one extra row to learn whether another page exists.
+    page = limit + 1
+    query = lambda_stmt(
+        lambda: select(*_TASK_COLUMNS).where(Task.user_id == current_user_id)
     )
-    tasks = result.scalars().all()
-    
-    return TaskList(
-        tasks=[TaskResponse.model_validate(task) for task in tasks],
-        total=len(tasks),
+    if cursor is not None:
+        cursor_created_at, cursor_id = _parse_cursor(cursor)
+        # Expanded form of (created_at, id) < (:ts, :id) - lambda_stmt can
+        # only track scalar closure variables as bound literals
+        query += lambda s: s.where(
+            (Task.created_at < cursor_created_at)
+            | ((Task.created_at == cursor_created_at) & (Task.id < cursor_id))
+        )
+    query += lambda s: s.order_by(Task.created_at.desc(), Task.id.desc()).limit(page)
+
+    result = await conn.execute(query)
+    rows = result.mappings().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = f"{last['created_at'].isoformat()}|{last['id']}"
+
+    return ORJSONResponse(
+        {
+            "tasks": [dict(row) for row in rows],
+            "total": total,
+            "next_cursor": next_cursor,
+        },
+        headers={"ETag": etag},
     )
 
 
 @router.post("", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
 async def create_task(
     task_data: TaskCreate,
-    current_user: User = Depends(get_current_user),
+    current_user_id: int = Depends(get_current_user_id),
     session: AsyncSession = Depends(get_session),
 ):
     """Create a new task for the authenticated user.
 
     Args:
         task_data: Task creation data (title and description)
-        current_user: Authenticated user from JWT token
+        current_user_id: Id of the authenticated user, straight from the token
         session: Database session
 
     Returns:
         Created task with all fields
     """
-    logger.info(f"Creating task for user {current_user.id}: {task_data.title}")
+    logger.info("Creating task for user %s: %s", current_user_id, task_data.title)
 
-    # Create new task with authenticated user_id
-    new_task = Task(
-        user_id=current_user.id,
-        title=task_data.title,
-        description=task_data.description,
-    )
-
-    session.add(new_task)
-    await session.commit()
-    await session.refresh(new_task)
+    # Single INSERT ... RETURNING with the authenticated user_id; no ORM
+    # flush + refresh SELECT round-trip. Only the server-generated columns
+    # come back - everything else is already in hand.
+    now = utcnow()
+    try:
+        result = await session.execute(
+            insert(Task)
+            .values(
+                user_id=current_user_id,
+                title=task_data.title,
+                description=task_data.description,
+                is_completed=False,
+                created_at=now,
+                updated_at=now,
+            )
+            .returning(Task.id, Task.created_at, Task.updated_at)
+        )
+        row = result.mappings().one()
+        await session.commit()
+    except IntegrityError:
+        # The user_id comes from a verified token, so the only constraint
+        # this insert can trip is the users FK - the account was deleted
+        # after the token (and the cached jwt_version) was validated
+        await session.rollback()
+        logger.warning("Task creation failed: user %s no longer exists", current_user_id)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
 
-    logger.info(f"Task created successfully: ID {new_task.id} for user {current_user.id}")
+    logger.info("Task created successfully: ID %s for user %s", row["id"], current_user_id)
 
-    return TaskResponse.model_validate(new_task)
+    # DB-sourced values need no revalidation; serialize them directly with
+    # orjson instead of routing through response_model field validation
+    return ORJSONResponse(
+        {
+            "id": row["id"],
+            "user_id": current_user_id,
+            "title": task_data.title,
+            "description": task_data.description,
+            "is_completed": False,
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        },
+        status_code=status.HTTP_201_CREATED,
+    )
 
 
 @router.get("/{task_id}", response_model=TaskResponse)
 async def get_task(
     task_id: int,
-    current_user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
+    if_none_match: Optional[str] = Header(None),
+    current_user_id: int = Depends(get_current_user_id),
+    conn: AsyncConnection = Depends(get_conn),
 ):
     """Get a specific task by ID.
-    
+
     Args:
         task_id: Task ID to retrieve
-        current_user: Authenticated user from JWT token
-        session: Database session
-        
+        if_none_match: ETag from a previous response, for conditional GET
+        current_user_id: Id of the authenticated user, straight from the token
+        conn: Read-only Core connection
+
     Returns:
-        Task details
-        
+        Task details, or 304 when the client's ETag is still current
+
     Raises:
         HTTPException: 404 if task not found, 403 if not owner
     """
-    # Fetch task by ID
-    result = await session.execute(select(Task).where(Task.id == task_id))
-    task = result.scalar_one_or_none()
-    
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task not found",
-        )
-    
-    # Verify ownership
-    if task.user_id != current_user.id:
-        logger.warning(
-            f"Authorization failed: user {current_user.id} attempted to access "
-            f"task {task_id} owned by user {task.user_id}"
-        )
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this task",
+    # Ownership lives in the WHERE clause: a mismatched owner matches zero
+    # rows, so forbidden requests never hydrate the row just to reject it.
+    # lambda_stmt caches the compiled SQL; only task_id/user_id rebind.
+    result = await conn.execute(
+        lambda_stmt(
+            lambda: select(*_TASK_COLUMNS).where(
+                Task.id == task_id, Task.user_id == current_user_id
+            )
         )
-    
-    return TaskResponse.model_validate(task)
+    )
+    row = result.mappings().first()
+
+    if row is None:
+        # Rare failure path: one extra query to distinguish 404 from 403
+        await _raise_not_found_or_forbidden(conn, task_id, current_user_id, "access")
+
+    # The row is fetched anyway for the ownership check, so the ETag costs
+    # nothing extra; on a match the client keeps its cached copy
+    etag = _task_etag(row["id"], row["updated_at"])
+    if if_none_match == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    # Rows come straight from the DB, so skip revalidation and serialize
+    # the mapping directly with orjson
+    return ORJSONResponse(dict(row), headers={"ETag": etag})
 
 
 @router.put("/{task_id}", response_model=TaskResponse)
 async def update_task(
     task_id: int,
     task_data: TaskUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user_id: int = Depends(get_current_user_id),
     session: AsyncSession = Depends(get_session),
 ):
     """Update a task.
@@ -133,7 +314,7 @@ async def update_task(
     Args:
         task_id: Task ID to update
         task_data: Task update data (title, description, is_completed)
-        current_user: Authenticated user from JWT token
+        current_user_id: Id of the authenticated user, straight from the token
         session: Database session
         
     Returns:
@@ -142,90 +323,71 @@ async def update_task(
     Raises:
         HTTPException: 404 if task not found, 403 if not owner
     """
-    # Fetch task by ID
-    result = await session.execute(select(Task).where(Task.id == task_id))
-    task = result.scalar_one_or_none()
-    
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task not found",
-        )
-    
-    # Verify ownership
-    if task.user_id != current_user.id:
-        logger.warning(
-            f"Authorization failed: user {current_user.id} attempted to update "
-            f"task {task_id} owned by user {task.user_id}"
+    logger.info("Updating task %s for user %s", task_id, current_user_id)
+
+    # Single UPDATE with ownership in the WHERE clause; RETURNING gives us the
+    # updated row without a separate SELECT or refresh round-trip
+    result = await session.execute(
+        update(Task)
+        .where(Task.id == task_id, Task.user_id == current_user_id)
+        .values(
+            **task_data.model_dump(exclude_unset=True, exclude_none=True),
+            updated_at=utcnow(),
         )
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to update this task",
+        .returning(
+            Task.id,
+            Task.user_id,
+            Task.title,
+            Task.description,
+            Task.is_completed,
+            Task.created_at,
+            Task.updated_at,
         )
+    )
+    row = result.mappings().first()
 
-    logger.info(f"Updating task {task_id} for user {current_user.id}")
-
-    # Update fields if provided
-    if task_data.title is not None:
-        task.title = task_data.title
-    if task_data.description is not None:
-        task.description = task_data.description
-    if task_data.is_completed is not None:
-        task.is_completed = task_data.is_completed
-
-    # Update timestamp
-    task.updated_at = datetime.utcnow()
+    if row is None:
+        # Nothing matched: re-query only on this cold path to distinguish
+        # a missing task (404) from an ownership violation (403)
+        await _raise_not_found_or_forbidden(session, task_id, current_user_id, "update")
 
-    session.add(task)
     await session.commit()
-    await session.refresh(task)
 
-    logger.info(f"Task {task_id} updated successfully for user {current_user.id}")
+    logger.info("Task %s updated successfully for user %s", task_id, current_user_id)
 
-    return TaskResponse.model_validate(task)
+    # Rows come straight from the DB, so skip revalidation and serialize
+    # the mapping directly with orjson
+    return ORJSONResponse(dict(row))
 
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_task(
     task_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user_id: int = Depends(get_current_user_id),
     session: AsyncSession = Depends(get_session),
 ):
     """Delete a task.
     
     Args:
         task_id: Task ID to delete
-        current_user: Authenticated user from JWT token
+        current_user_id: Id of the authenticated user, straight from the token
         session: Database session
         
     Raises:
         HTTPException: 404 if task not found, 403 if not owner
     """
-    # Fetch task by ID
-    result = await session.execute(select(Task).where(Task.id == task_id))
-    task = result.scalar_one_or_none()
-    
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task not found",
-        )
-    
-    # Verify ownership
-    if task.user_id != current_user.id:
-        logger.warning(
-            f"Authorization failed: user {current_user.id} attempted to delete "
-            f"task {task_id} owned by user {task.user_id}"
-        )
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to delete this task",
-        )
+    logger.info("Deleting task %s for user %s", task_id, current_user_id)
+
+    # Single DELETE with ownership in the WHERE clause; no pre-fetch needed
+    result = await session.execute(
+        delete(Task).where(Task.id == task_id, Task.user_id == current_user_id)
+    )
 
-    logger.info(f"Deleting task {task_id} for user {current_user.id}")
+    if result.rowcount == 0:
+        # Nothing matched: re-query only on this cold path to distinguish
+        # a missing task (404) from an ownership violation (403)
+        await _raise_not_found_or_forbidden(session, task_id, current_user_id, "delete")
 
-    # Delete task
-    await session.delete(task)
     await session.commit()
 
-    logger.info(f"Task {task_id} deleted successfully for user {current_user.id}")
+    logger.info("Task %s deleted successfully for user %s", task_id, current_user_id)
@@ -37,6 +37,10 @@ class Settings(BaseSettings):
 
         return v
     
+    # Redis cache (optional - user caching is disabled when unset)
+    REDIS_URL: str = ""
+    USER_CACHE_TTL_SECONDS: int = 300
+
     # JWT Configuration
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
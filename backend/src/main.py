@@ -1,11 +1,27 @@
 """FastAPI application entry point."""
+import asyncio
+import logging
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, suppress
+from logging.handlers import QueueHandler, QueueListener
+
 from fastapi import FastAPI, HTTPException
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from src.api import auth, tasks
 from src.config import settings
-from src.database import create_db_and_tables
+from src.database import (
+    close_pg_pool,
+    create_db_and_tables,
+    engine,
+    init_pg_pool,
+    redis_client,
+)
+from src.utils.jwt import run_cache_invalidation_listener
 from src.middleware.error_handler import (
     general_exception_handler,
     http_exception_handler,
@@ -13,6 +29,56 @@ from src.middleware.error_handler import (
 )
 from src.models.user import User
 from src.models.task import Task
+from src.schemas.auth import AuthResponse, UserLogin, UserRegister, UserResponse
+from src.schemas.task import TaskCreate, TaskList, TaskResponse, TaskUpdate
+
+def _setup_queue_logging() -> QueueListener:
+    """Route log records through an in-memory queue to a background thread.
+
+    Handlers that write to stdout no longer run on the event loop thread,
+    so a burst of errors cannot stall request handling on stream flushes.
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s")
+    )
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+
+    root = logging.getLogger()
+    root.handlers = [QueueHandler(log_queue)]
+    root.setLevel(logging.DEBUG if settings.DEBUG else logging.INFO)
+
+    listener.start()
+    return listener
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Manage startup/shutdown: create tables and pools, dispose on exit."""
+    log_listener = _setup_queue_logging()
+    # Size the default executor for the CPU-bound bcrypt calls offloaded
+    # by the auth endpoints
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=(os.cpu_count() or 1) * 2)
+    )
+    await create_db_and_tables()
+    await init_pg_pool()
+    # Keep per-worker caches coherent: evict users other workers invalidate
+    cache_listener = (
+        asyncio.create_task(run_cache_invalidation_listener())
+        if redis_client is not None
+        else None
+    )
+    yield
+    if cache_listener is not None:
+        cache_listener.cancel()
+        with suppress(asyncio.CancelledError):
+            await cache_listener
+    await close_pg_pool()
+    await engine.dispose()
+    log_listener.stop()
+
 
 # Create FastAPI application
 app = FastAPI(
@@ -20,9 +86,30 @@ app = FastAPI(
     description="RESTful API for multi-user task management with JWT authentication",
     version="1.0.0",
     debug=settings.DEBUG,
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,  # orjson is ~2-3x faster than json.dumps
 )
 
-# Configure CORS middleware
+# Pre-warm pydantic-core validators/serializers at import so the first
+# request doesn't pay the lazy schema-materialization cost
+for _model in (
+    UserRegister,
+    UserLogin,
+    UserResponse,
+    AuthResponse,
+    TaskCreate,
+    TaskUpdate,
+    TaskResponse,
+    TaskList,
+):
+    _model.model_rebuild()
+    try:
+        _model.model_validate_json(b"{}")
+    except Exception:
+        # Validation is expected to fail; only schema compilation matters
+        pass
+
+# Configure CORS middleware (parsed once at import)
 origins = [origin.strip() for origin in settings.CORS_ORIGINS.split(",")]
 
 app.add_middleware(
@@ -51,15 +138,3 @@ async def health_check():
         "message": "Task Management API is running",
         "version": "1.0.0",
     }
-
-
-@app.on_event("startup")
-async def startup_event():
-    """Initialize database tables on startup."""
-    await create_db_and_tables()
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Cleanup on shutdown."""
-    pass
@@ -1,28 +1,67 @@
 """Custom exception handlers for standardized error responses."""
-from fastapi import HTTPException, Request, status
+import logging
+
+import orjson
+from fastapi import HTTPException, Request, Response, status
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 
+logger = logging.getLogger(__name__)
+
+
+def _http_error_body(status_code: int, message: str) -> bytes:
+    """Serialize the standard http_error envelope with orjson."""
+    return orjson.dumps(
+        {
+            "error": {
+                "type": "http_error",
+                "status_code": status_code,
+                "message": message,
+            }
+        }
+    )
+
+
+# Responses for the fixed auth/ownership messages are serialized once at
+# import; 401/403/404 storms then reuse the same bytes instead of
+# rebuilding and re-serializing an identical payload per request
+_HTTP_TEMPLATES = {
+    (code, message): _http_error_body(code, message)
+    for code, message in (
+        (status.HTTP_401_UNAUTHORIZED, "Token has expired"),
+        (status.HTTP_401_UNAUTHORIZED, "Invalid token claims"),
+        (status.HTTP_401_UNAUTHORIZED, "Invalid token"),
+        (status.HTTP_401_UNAUTHORIZED, "Could not validate credentials"),
+        (status.HTTP_401_UNAUTHORIZED, "User not found"),
+        (status.HTTP_401_UNAUTHORIZED, "Incorrect email or password"),
+        (status.HTTP_403_FORBIDDEN, "Not authorized to access this task"),
+        (status.HTTP_403_FORBIDDEN, "Not authorized to update this task"),
+        (status.HTTP_403_FORBIDDEN, "Not authorized to delete this task"),
+        (status.HTTP_404_NOT_FOUND, "Task not found"),
+    )
+}
+
 
-async def http_exception_handler(request: Request, exc: HTTPException) -> JSONResponse:
+async def http_exception_handler(request: Request, exc: HTTPException) -> Response:
     """Handle HTTPException with standardized error response.
-    
+
     Args:
         request: The incoming request
         exc: The HTTPException raised
-        
+
     Returns:
-        JSONResponse with error details
+        Response with error details
     """
-    return JSONResponse(
+    template = _HTTP_TEMPLATES.get((exc.status_code, exc.detail))
+    content = (
+        template
+        if template is not None
+        else _http_error_body(exc.status_code, exc.detail)
+    )
+    return Response(
+        content=content,
         status_code=exc.status_code,
-        content={
-            "error": {
-                "type": "http_error",
-                "status_code": exc.status_code,
-                "message": exc.detail,
-            }
-        },
+        media_type="application/json",
     )
 
 
@@ -70,9 +109,10 @@ async def general_exception_handler(request: Request, exc: Exception) -> JSONRes
     Returns:
         JSONResponse with generic error message (no internal details exposed)
     """
-    # Log the actual exception for debugging (in production, use proper logging)
-    print(f"Unexpected error: {type(exc).__name__}: {str(exc)}")
-    
+    # Structured log with traceback; routed through the queue-based logging
+    # set up at startup, so the hot path never blocks on stdout
+    logger.exception("Unexpected error: %s: %s", type(exc).__name__, exc)
+
     return JSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
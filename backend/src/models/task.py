@@ -2,21 +2,31 @@
 from datetime import datetime
 from typing import Optional
 
+from sqlalchemy import Index, desc
 from sqlmodel import Field, Relationship, SQLModel
 
+from src.utils.time import utcnow
+
 
 class Task(SQLModel, table=True):
     """Task entity for task management."""
-    
+
     __tablename__ = "tasks"
-    
+    # Composite index matching get_tasks' filter + ordering so Postgres can
+    # do an index range scan instead of a bitmap scan + in-memory sort. The
+    # trailing id keeps the order total for keyset pagination when several
+    # tasks share a created_at. Covers single-column user_id lookups too.
+    __table_args__ = (
+        Index("ix_tasks_user_created", "user_id", desc("created_at"), desc("id")),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: int = Field(foreign_key="users.id", index=True)
+    user_id: int = Field(foreign_key="users.id")
     title: str = Field(max_length=255)
     description: Optional[str] = Field(default=None, max_length=1000)
     is_completed: bool = Field(default=False)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
     
     # Relationship to user
     user: Optional["User"] = Relationship(back_populates="tasks")
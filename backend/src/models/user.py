@@ -4,6 +4,8 @@ from typing import Optional
 
 from sqlmodel import Field, Relationship, SQLModel
 
+from src.utils.time import utcnow
+
 
 class User(SQLModel, table=True):
     """User entity for authentication."""
@@ -13,8 +15,11 @@ class User(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     email: str = Field(unique=True, index=True, max_length=255)
     hashed_password: str = Field(max_length=255)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    # Embedded in tokens as the "ver" claim; incrementing it revokes every
+    # previously issued token for this user in a single UPDATE
+    jwt_version: int = Field(default=0, nullable=False)
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
     
     # Relationship to tasks
     tasks: list["Task"] = Relationship(back_populates="user")
@@ -71,6 +71,15 @@ class TaskResponse(BaseModel):
 
 class TaskList(BaseModel):
     """Schema for list of tasks with metadata."""
-    
+
     tasks: list[TaskResponse] = Field(..., description="List of tasks")
-    total: int = Field(..., description="Total number of tasks")
+    total: int = Field(
+        ..., description="Total number of tasks owned by the user, across all pages"
+    )
+    next_cursor: Optional[str] = Field(
+        None,
+        description=(
+            "Opaque '<created_at>|<id>' cursor; pass as ?cursor= to fetch "
+            "the next page; null on the last page"
+        ),
+    )
@@ -1,24 +1,68 @@
 """JWT token creation and validation utilities."""
+import asyncio
+import hashlib
 import logging
-from datetime import datetime, timedelta
+import time
+from datetime import timedelta
 from typing import Optional
 
+import jwt
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from jose import JWTError, jwt
-from jose.exceptions import ExpiredSignatureError, JWTClaimsError
+from jwt.exceptions import (
+    ExpiredSignatureError,
+    InvalidAudienceError,
+    InvalidIssuerError,
+    InvalidTokenError,
+    MissingRequiredClaimError,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
+from src import database
 from src.config import settings
-from src.database import get_session
+from src.database import get_session, redis_client
 from src.models.user import User
+from src.utils.time import utcnow
 
 logger = logging.getLogger(__name__)
 
 # HTTP Bearer token scheme
 security = HTTPBearer()
 
+# Precomputed at module load so the HMAC path never re-encodes the secret
+# or rebuilds the algorithm list per call
+_SECRET = settings.JWT_SECRET.encode()
+_ALGORITHMS = [settings.JWT_ALGORITHM]
+
+# Verified-token cache: the same token accompanies many consecutive requests
+# from one client, so skip the HMAC verify + base64/JSON decode for up to 60s.
+# Keyed by a token digest so raw tokens never sit in memory; expiry is still
+# enforced against the cached exp claim on every hit.
+_decode_cache: TTLCache = TTLCache(maxsize=10000, ttl=60)
+
+# In-process user cache: first line of defense before Redis (if configured)
+# and the database. Short TTL keeps staleness bounded for single-process
+# deployments; invalidate_user_cache clears it alongside Redis.
+_user_cache: TTLCache = TTLCache(maxsize=5000, ttl=30)
+
+# user id -> current jwt_version, so revocation is enforced on the DB-free
+# task path with at most one single-column lookup per user per TTL window.
+# Cleared alongside _user_cache by invalidate_user_cache and the pubsub
+# listener so a version bump takes effect promptly.
+_jwt_version_cache: TTLCache = TTLCache(maxsize=10000, ttl=30)
+
+# Single-flight registry for cold user loads: concurrent requests bearing
+# tokens for the same user await one Redis/DB fetch instead of stampeding.
+# Keyed by user id; entries live only for the duration of the load.
+_user_load_inflight: dict = {}
+
+
+def _token_cache_key(token: str) -> bytes:
+    """Digest a raw token into a fixed-size cache key."""
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token.
@@ -33,19 +77,24 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     to_encode = data.copy()
     
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = utcnow() + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(hours=settings.JWT_EXPIRATION_HOURS)
+        expire = utcnow() + timedelta(hours=settings.JWT_EXPIRATION_HOURS)
     
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
-    
+    encoded_jwt = jwt.encode(to_encode, _SECRET, algorithm=settings.JWT_ALGORITHM)
+
     return encoded_jwt
 
 
 def decode_token(token: str) -> dict:
     """Decode and validate a JWT token.
 
+    Runs inline rather than in a threadpool on purpose: with the secret
+    pre-encoded and the verified-token cache above, a decode is a few
+    microseconds of HMAC work - far cheaper than a thread hop - so it
+    cannot meaningfully stall the event loop.
+
     Args:
         token: JWT token string to decode
 
@@ -55,8 +104,28 @@ def decode_token(token: str) -> dict:
     Raises:
         HTTPException: If token is invalid or expired
     """
+    cache_key = _token_cache_key(token)
+    cached = _decode_cache.get(cache_key)
+    if cached is not None:
+        # Signature already verified; only expiry can have changed since
+        if cached.get("exp", 0) > time.time():
+            return cached
+        del _decode_cache[cache_key]
+        logger.warning("Token validation failed: Token has expired")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has expired",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+        # exp is required so every cached payload carries it - without this,
+        # a no-expiry token would verify once and then trip the cached-exp
+        # check above on each later hit
+        payload = jwt.decode(
+            token, _SECRET, algorithms=_ALGORITHMS, options={"require": ["exp"]}
+        )
+        _decode_cache[cache_key] = payload
         return payload
     except ExpiredSignatureError:
         logger.warning("Token validation failed: Token has expired")
@@ -65,15 +134,15 @@ def decode_token(token: str) -> dict:
             detail="Token has expired",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    except JWTClaimsError as e:
-        logger.warning(f"Token validation failed: Invalid token claims - {type(e).__name__}")
+    except (MissingRequiredClaimError, InvalidAudienceError, InvalidIssuerError) as e:
+        logger.warning("Token validation failed: Invalid token claims - %s", type(e).__name__)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token claims",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    except JWTError as e:
-        logger.warning(f"Token validation failed: {type(e).__name__}")
+    except InvalidTokenError as e:
+        logger.warning("Token validation failed: %s", type(e).__name__)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token",
@@ -81,6 +150,96 @@ def decode_token(token: str) -> dict:
         )
 
 
+async def get_current_user_id(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    session: AsyncSession = Depends(get_session),
+) -> int:
+    """Dependency returning just the authenticated user's id.
+
+    Verifies the token and extracts the ``sub`` claim without loading the
+    full User row. Intended for endpoints that only need the id for
+    ownership filtering - which is every task handler. Revocation is still
+    enforced: the token's ``ver`` claim is compared against the user's
+    current jwt_version, fetched as a single column at most once per TTL
+    window and served from _jwt_version_cache in between, so the hot path
+    stays off the database.
+
+    Args:
+        credentials: HTTP Bearer token from request header
+        session: Database session (only touched on a version-cache miss)
+
+    Returns:
+        The authenticated user's id
+
+    Raises:
+        HTTPException: If the token is invalid, carries no usable subject,
+            names a nonexistent user, or predates a jwt_version bump
+    """
+    payload = decode_token(credentials.credentials)
+
+    user_id = payload.get("sub")
+    try:
+        uid = int(user_id)
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    ver = _jwt_version_cache.get(uid)
+    if ver is None:
+        if database.pg_pool is not None:
+            ver = await database.pg_pool.fetchval(
+                "SELECT jwt_version FROM users WHERE id = $1", uid
+            )
+        else:
+            result = await session.execute(
+                select(User.jwt_version).where(User.id == uid)
+            )
+            ver = result.scalar_one_or_none()
+        if ver is None:
+            # Signature-valid token for a user that no longer exists
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        _jwt_version_cache[uid] = ver
+
+    if payload.get("ver", 0) != ver:
+        logger.warning("Token validation failed: stale jwt_version for user %s", uid)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return uid
+
+
+def _check_token_version(payload: dict, user: User) -> User:
+    """Reject tokens issued before the user's last revocation.
+
+    Tokens carry the user's jwt_version as the "ver" claim; bumping the
+    column (UPDATE users SET jwt_version = jwt_version + 1) revokes every
+    outstanding token in one statement, with no per-token state. The check
+    runs against whatever copy of the user is in hand, so cached rows bound
+    revocation latency by the cache TTLs.
+
+    Raises:
+        HTTPException: If the token's version no longer matches
+    """
+    if payload.get("ver", 0) != user.jwt_version:
+        logger.warning("Token validation failed: stale jwt_version for user %s", user.id)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     session: AsyncSession = Depends(get_session),
@@ -108,17 +267,134 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Fetch user from database
-    # result = await session.execute(select(User).where(User.id == user_id))
-    result = await session.execute(select(User).where(User.id == int(user_id)))
+    # In-process cache first - no serialization, no network
+    uid = int(user_id)
+    user = _user_cache.get(uid)
+    if user is not None:
+        return _check_token_version(payload, user)
+
+    # Single-flight: if another request is already loading this user, await
+    # its result instead of issuing a duplicate Redis/DB fetch. Only cold
+    # misses ever reach this point, so the registry stays tiny.
+    inflight = _user_load_inflight.get(uid)
+    if inflight is not None:
+        user = await inflight
+        return _check_token_version(payload, user)
+
+    future = asyncio.get_running_loop().create_future()
+    _user_load_inflight[uid] = future
+    try:
+        user = await _load_user(uid, session)
+    except BaseException as exc:
+        future.set_exception(exc)
+        # Mark retrieved so an unawaited future doesn't warn on GC
+        future.exception()
+        raise
+    else:
+        future.set_result(user)
+        return _check_token_version(payload, user)
+    finally:
+        _user_load_inflight.pop(uid, None)
+
+
+async def _load_user(uid: int, session: AsyncSession) -> User:
+    """Fetch a user through the cache hierarchy: Redis, asyncpg pool, ORM.
+
+    Populates both cache layers on the way out so followers and later
+    requests hit in memory.
+
+    Raises:
+        HTTPException: 401 if no such user exists
+    """
+    cache_key = f"user:{uid}"
+    # Redis first, to skip the per-request SELECT across processes
+    if redis_client is not None:
+        cached_user = await redis_client.get(cache_key)
+        if cached_user is not None:
+            user = User.model_validate_json(cached_user)
+            _user_cache[uid] = user
+            return user
+
+    # Hot path: single-row fetch over the native asyncpg pool, bypassing
+    # SQLAlchemy statement compilation and ORM row construction
+    if database.pg_pool is not None:
+        record = await database.pg_pool.fetchrow(
+            "SELECT id, email, hashed_password, jwt_version, created_at, updated_at "
+            "FROM users WHERE id = $1",
+            uid,
+        )
+        user = User(**dict(record)) if record is not None else None
+    else:
+        # Fallback: ORM session (also used by the test suite)
+        result = await session.execute(select(User).where(User.id == uid))
+        user = result.scalar_one_or_none()
 
-    user = result.scalar_one_or_none()
-    
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
+
+    # Cache with a short TTL so subsequent requests skip the DB round-trip
+    _user_cache[uid] = user
+    _jwt_version_cache[uid] = user.jwt_version
+    if redis_client is not None:
+        await redis_client.setex(
+            cache_key, settings.USER_CACHE_TTL_SECONDS, user.model_dump_json()
+        )
+
     return user
+
+
+# Channel carrying user ids whose cached entries must be dropped; every
+# worker subscribes so in-process caches stay coherent across a fleet
+_INVALIDATION_CHANNEL = "auth:cache-invalidate"
+
+
+async def invalidate_user_cache(user_id: int) -> None:
+    """Remove a user's cached entry (e.g. on logout).
+
+    Clears the local cache and the shared Redis entry, then broadcasts the
+    id so other workers evict their in-process copies too - without this,
+    each worker would serve the stale row until its TTL lapsed.
+
+    Args:
+        user_id: ID of the user whose cache entry should be removed
+    """
+    _user_cache.pop(user_id, None)
+    _jwt_version_cache.pop(user_id, None)
+    if redis_client is not None:
+        await redis_client.delete(f"user:{user_id}")
+        await redis_client.publish(_INVALIDATION_CHANNEL, str(user_id))
+
+
+async def run_cache_invalidation_listener() -> None:
+    """Evict locally cached users invalidated by other workers.
+
+    Started as a background task at application startup when Redis is
+    configured; each worker subscribes to the invalidation channel and
+    drops the named user from its in-process cache as messages arrive,
+    bounding cross-worker revocation latency to pubsub delivery time
+    instead of the cache TTL.
+    """
+    if redis_client is None:
+        return
+    pubsub = redis_client.pubsub()
+    await pubsub.subscribe(_INVALIDATION_CHANNEL)
+    try:
+        async for message in pubsub.listen():
+            if message.get("type") != "message":
+                continue
+            try:
+                stale_id = int(message["data"])
+                _user_cache.pop(stale_id, None)
+                _jwt_version_cache.pop(stale_id, None)
+            except (TypeError, ValueError):
+                logger.warning(
+                    "Ignoring malformed cache invalidation message: %r",
+                    message.get("data"),
+                )
+    finally:
+        await pubsub.unsubscribe(_INVALIDATION_CHANNEL)
+        await pubsub.aclose()
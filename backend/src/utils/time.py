@@ -0,0 +1,15 @@
+"""Time helpers shared by models and endpoints."""
+from datetime import datetime, timezone
+
+
+def utcnow() -> datetime:
+    """Return the current UTC time as a naive datetime.
+
+    Replaces the deprecated datetime.utcnow(). The tzinfo is stripped so
+    values stay compatible with the TIMESTAMP WITHOUT TIME ZONE columns
+    used by the models.
+
+    Returns:
+        Current UTC time without tzinfo
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,19 @@
+"""Shared helpers for seeding test data directly in the database."""
+from typing import List
+
+from src.models.task import Task
+
+
+async def seed_tasks(session_maker, user_id: int, titles: List[str]) -> List[int]:
+    """Insert tasks for a user in one transaction and return their ids.
+
+    Bypasses the HTTP layer for setup data the tests only read back -
+    one commit instead of a full request/response cycle per task.
+    """
+    tasks = [Task(user_id=user_id, title=title) for title in titles]
+    async with session_maker() as session:
+        session.add_all(tasks)
+        await session.commit()
+        for task in tasks:
+            await session.refresh(task)
+    return [task.id for task in tasks]
@@ -5,21 +5,17 @@ including IDOR, privilege escalation, token replay, race conditions, and
 parameter manipulation.
 """
 import pytest
-import asyncio
-from datetime import datetime, timedelta
-from jose import jwt
-from src.config import settings
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
 
 
 class TestIDORAttack:
     """Test resistance to Insecure Direct Object Reference (IDOR) attacks."""
 
-    def test_sequential_id_enumeration(self, client, alice_user, bob_user):
+    def test_sequential_id_enumeration(self, client, alice_user, bob_user, alice_headers, bob_headers):
         """Test that users cannot enumerate resources by guessing sequential IDs (T035)."""
         alice = alice_user
         bob = bob_user
-        alice_headers = {"Authorization": f"Bearer {alice['token']}"}
-        bob_headers = {"Authorization": f"Bearer {bob['token']}"}
 
         # Alice creates 3 tasks
         alice_task_ids = []
@@ -41,29 +37,24 @@ class TestIDORAttack:
             )
             bob_task_ids.append(response.json()["id"])
 
-        # Bob attempts to enumerate all IDs from 1 to max(alice_task_ids)
-        max_id = max(alice_task_ids + bob_task_ids)
-        accessible_ids = []
-        forbidden_count = 0
+        # Bob's list view should only ever contain his own tasks - one call
+        # covers the whole ID space instead of probing every ID individually
+        listed_ids = {
+            task["id"]
+            for task in client.get("/tasks", headers=bob_headers).json()["tasks"]
+        }
+        assert listed_ids == set(bob_task_ids)
 
-        for task_id in range(1, max_id + 1):
+        # Targeted probes on IDs known to belong to Alice must all be 403
+        for task_id in alice_task_ids:
             response = client.get(f"/tasks/{task_id}", headers=bob_headers)
-            if response.status_code == 200:
-                accessible_ids.append(task_id)
-            elif response.status_code == 403:
-                forbidden_count += 1
-
-        # Bob should only access his own tasks
-        assert set(accessible_ids) == set(bob_task_ids)
-        # Bob should get 403 for Alice's tasks
-        assert forbidden_count >= len(alice_task_ids)
+            assert response.status_code == 403
 
-    def test_id_guessing_with_large_gaps(self, client, alice_user, bob_user):
+    @pytest.mark.parametrize("offset", [-10, -5, -1, 0, 1, 5, 10])
+    def test_id_guessing_with_large_gaps(self, client, alice_user, bob_user, offset, alice_headers, bob_headers):
         """Test that ID guessing doesn't work even with large ID gaps."""
         alice = alice_user
         bob = bob_user
-        alice_headers = {"Authorization": f"Bearer {alice['token']}"}
-        bob_headers = {"Authorization": f"Bearer {bob['token']}"}
 
         # Alice creates a task
         alice_response = client.post(
@@ -73,28 +64,25 @@ class TestIDORAttack:
         )
         alice_task_id = alice_response.json()["id"]
 
-        # Bob tries to guess IDs around Alice's task ID
-        for offset in [-10, -5, -1, 0, 1, 5, 10]:
-            guess_id = alice_task_id + offset
-            response = client.get(f"/tasks/{guess_id}", headers=bob_headers)
+        # Bob tries to guess an ID near Alice's task ID
+        guess_id = alice_task_id + offset
+        response = client.get(f"/tasks/{guess_id}", headers=bob_headers)
 
-            # Bob should either get 404 (doesn't exist) or 403 (not authorized)
-            # Never 200 for Alice's tasks
-            if response.status_code == 200:
-                # If 200, verify it's Bob's own task
-                task_data = response.json()
-                assert task_data["user_id"] == bob["user_id"]
+        # Bob should either get 404 (doesn't exist) or 403 (not authorized)
+        # Never 200 for Alice's tasks
+        if response.status_code == 200:
+            # If 200, verify it's Bob's own task
+            task_data = response.json()
+            assert task_data["user_id"] == bob["user_id"]
 
 
 class TestHorizontalPrivilegeEscalation:
     """Test resistance to horizontal privilege escalation attacks."""
 
-    def test_token_substitution_attack(self, client, alice_user, bob_user):
+    def test_token_substitution_attack(self, client, alice_user, bob_user, alice_headers, bob_headers):
         """Test that substituting tokens doesn't grant access to other users' data (T036)."""
         alice = alice_user
         bob = bob_user
-        alice_headers = {"Authorization": f"Bearer {alice['token']}"}
-        bob_headers = {"Authorization": f"Bearer {bob['token']}"}
 
         # Alice creates a task
         alice_task = client.post(
@@ -108,24 +96,15 @@ class TestHorizontalPrivilegeEscalation:
 
         # Should be blocked with 403
         assert response.status_code == 403
-        assert "Not authorized" in response.json()["detail"]
+        assert "Not authorized" in response.json()["error"]["message"]
 
-    def test_user_id_manipulation_in_token(self, client, alice_user, bob_user):
+    def test_user_id_manipulation_in_token(self, client, alice_task, bob_user, make_token):
         """Test that manipulating user_id in token payload is detected."""
-        alice = alice_user
         bob = bob_user
 
         # Create a token with Bob's user_id but signed with correct secret
         # This simulates an attacker who knows the secret trying to impersonate
-        malicious_payload = {
-            "sub": bob["user_id"],  # Bob's ID
-            "exp": datetime.utcnow() + timedelta(hours=24)
-        }
-        malicious_token = jwt.encode(
-            malicious_payload,
-            settings.JWT_SECRET,
-            algorithm=settings.JWT_ALGORITHM
-        )
+        malicious_token = make_token(bob["user_id"])
 
         # Use malicious token to try to access Bob's tasks
         headers = {"Authorization": f"Bearer {malicious_token}"}
@@ -134,29 +113,19 @@ class TestHorizontalPrivilegeEscalation:
         # This should work because the token is valid and correctly identifies Bob
         assert response.status_code == 200
 
-        # But Bob should only see his own tasks, not Alice's
-        alice_headers = {"Authorization": f"Bearer {alice['token']}"}
-        alice_task = client.post(
-            "/tasks",
-            json={"title": "Alice's task"},
-            headers=alice_headers
-        ).json()
-
         # Bob's token should not give access to Alice's task
         bob_access = client.get(f"/tasks/{alice_task['id']}", headers=headers)
         assert bob_access.status_code == 403
 
-    def test_privilege_escalation_via_update(self, client, alice_user, bob_user):
+    def test_privilege_escalation_via_update(self, client, alice_user, bob_user, alice_headers, bob_headers):
         """Test that users cannot escalate privileges by updating resources."""
         alice = alice_user
         bob = bob_user
-        alice_headers = {"Authorization": f"Bearer {alice['token']}"}
-        bob_headers = {"Authorization": f"Bearer {bob['token']}"}
 
         # Alice creates a task
         alice_task = client.post(
             "/tasks",
-            json={"title": "Alice's task"},
+            json={"title": "Alice original task"},
             headers=alice_headers
         ).json()
 
@@ -177,38 +146,31 @@ class TestHorizontalPrivilegeEscalation:
         # Verify Alice's task is unchanged
         verify_response = client.get(f"/tasks/{alice_task['id']}", headers=alice_headers)
         assert verify_response.status_code == 200
-        assert verify_response.json()["user_id"] == alice["user_id"]
-        assert verify_response.json()["title"] == "Alice's task"
+        verified_task = verify_response.json()
+        assert verified_task["user_id"] == alice["user_id"]
+        assert verified_task["title"] == "Alice original task"
 
 
 class TestTokenReplayAttack:
     """Test resistance to token replay attacks."""
 
-    def test_expired_token_replay(self, client, alice_credentials):
+    def test_expired_token_replay(self, client, alice_credentials, make_token):
         """Test that expired tokens cannot be replayed (T037)."""
         # Register user
         register_response = client.post("/auth/register", json=alice_credentials)
         user_id = register_response.json()["user"]["id"]
 
         # Create an expired token
-        expired_payload = {
-            "sub": user_id,
-            "exp": datetime.utcnow() - timedelta(hours=1)
-        }
-        expired_token = jwt.encode(
-            expired_payload,
-            settings.JWT_SECRET,
-            algorithm=settings.JWT_ALGORITHM
-        )
+        expired_token = make_token(user_id, timedelta(hours=-1))
 
         # Attempt to replay expired token multiple times
         headers = {"Authorization": f"Bearer {expired_token}"}
 
-        for _ in range(3):
+        for _ in range(2):
             response = client.get("/tasks", headers=headers)
             # Should consistently reject expired token
             assert response.status_code == 401
-            assert "expired" in response.json()["detail"].lower()
+            assert "expired" in response.json()["error"]["message"].lower()
 
     def test_old_token_after_password_change(self, client, alice_user):
         """Test that old tokens should ideally be invalidated after password change.
@@ -227,13 +189,12 @@ class TestTokenReplayAttack:
         # TODO: Implement token revocation/blacklist for password changes
         # After password change, old tokens should be rejected
 
-    def test_token_reuse_across_sessions(self, client, alice_user):
+    def test_token_reuse_across_sessions(self, client, alice_headers):
         """Test that tokens can be reused within their validity period (expected behavior)."""
-        alice = alice_user
-        headers = {"Authorization": f"Bearer {alice['token']}"}
+        headers = alice_headers
 
-        # Use token multiple times
-        for _ in range(5):
+        # Two uses establish reusability; more adds round-trips, not coverage
+        for _ in range(2):
             response = client.get("/tasks", headers=headers)
             assert response.status_code == 200
 
@@ -244,69 +205,34 @@ class TestTokenReplayAttack:
 class TestRaceConditionAttack:
     """Test resistance to race condition attacks."""
 
-    @pytest.mark.asyncio
-    async def test_concurrent_access_attempts(self, client, alice_user, bob_user):
+    def test_concurrent_access_attempts(self, client, alice_task, bob_headers):
         """Test that concurrent requests don't bypass authorization (T038)."""
-        alice = alice_user
-        bob = bob_user
-        alice_headers = {"Authorization": f"Bearer {alice['token']}"}
-        bob_headers = {"Authorization": f"Bearer {bob['token']}"}
-
-        # Alice creates a task
-        alice_task = client.post(
-            "/tasks",
-            json={"title": "Alice's task"},
-            headers=alice_headers
-        ).json()
-
-        # Bob attempts concurrent access to Alice's task
-        async def attempt_access():
+        # Bob attempts concurrent access to Alice's task.
+        # TestClient.get is synchronous, so threads (not asyncio.gather over
+        # coroutines that never yield) are what actually run requests in parallel
+        def attempt_access(_):
             return client.get(f"/tasks/{alice_task['id']}", headers=bob_headers)
 
         # Launch 10 concurrent requests
-        tasks = [attempt_access() for _ in range(10)]
-        responses = await asyncio.gather(*tasks)
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            responses = list(executor.map(attempt_access, range(10)))
 
         # All requests should be blocked with 403
         for response in responses:
             assert response.status_code == 403
 
-    def test_concurrent_create_and_access(self, client, alice_user, bob_user):
+    def test_concurrent_create_and_access(self, client, alice_task, bob_headers):
         """Test race condition between create and unauthorized access."""
-        alice = alice_user
-        bob = bob_user
-        alice_headers = {"Authorization": f"Bearer {alice['token']}"}
-        bob_headers = {"Authorization": f"Bearer {bob['token']}"}
-
-        # Alice creates a task
-        alice_task = client.post(
-            "/tasks",
-            json={"title": "Alice's new task"},
-            headers=alice_headers
-        ).json()
-
         # Bob immediately tries to access it (simulating race condition)
         response = client.get(f"/tasks/{alice_task['id']}", headers=bob_headers)
 
         # Should still be blocked
         assert response.status_code == 403
 
-    def test_concurrent_update_attempts(self, client, alice_user, bob_user):
+    def test_concurrent_update_attempts(self, client, alice_task, alice_headers, bob_headers):
         """Test that concurrent updates maintain authorization."""
-        alice = alice_user
-        bob = bob_user
-        alice_headers = {"Authorization": f"Bearer {alice['token']}"}
-        bob_headers = {"Authorization": f"Bearer {bob['token']}"}
-
-        # Alice creates a task
-        alice_task = client.post(
-            "/tasks",
-            json={"title": "Original title"},
-            headers=alice_headers
-        ).json()
-
         # Alice and Bob both try to update simultaneously
-        alice_update = {"title": "Alice's update"}
+        alice_update = {"title": "Alice final update"}
         bob_update = {"title": "Bob's malicious update"}
 
         alice_response = client.put(
@@ -328,17 +254,16 @@ class TestRaceConditionAttack:
 
         # Verify final state is Alice's update
         verify_response = client.get(f"/tasks/{alice_task['id']}", headers=alice_headers)
-        assert verify_response.json()["title"] == "Alice's update"
+        assert verify_response.json()["title"] == "Alice final update"
 
 
 class TestParameterManipulationAttack:
     """Test resistance to parameter manipulation attacks."""
 
-    def test_user_id_injection_in_create(self, client, alice_user, bob_user):
+    def test_user_id_injection_in_create(self, client, alice_user, bob_user, alice_headers, bob_headers):
         """Test that user_id in request body is ignored during creation (T039)."""
         alice = alice_user
         bob = bob_user
-        alice_headers = {"Authorization": f"Bearer {alice['token']}"}
 
         # Alice attempts to create a task for Bob by injecting user_id
         malicious_data = {
@@ -357,23 +282,14 @@ class TestParameterManipulationAttack:
         assert created_task["user_id"] != bob["user_id"]
 
         # Verify Bob cannot see this task
-        bob_headers = {"Authorization": f"Bearer {bob['token']}"}
         bob_tasks = client.get("/tasks", headers=bob_headers).json()
         bob_task_ids = [task["id"] for task in bob_tasks["tasks"]]
         assert created_task["id"] not in bob_task_ids
 
-    def test_user_id_injection_in_update(self, client, alice_user, bob_user):
+    def test_user_id_injection_in_update(self, client, alice_user, bob_user, alice_task, alice_headers):
         """Test that user_id cannot be changed via update."""
         alice = alice_user
         bob = bob_user
-        alice_headers = {"Authorization": f"Bearer {alice['token']}"}
-
-        # Alice creates a task
-        alice_task = client.post(
-            "/tasks",
-            json={"title": "Alice's task"},
-            headers=alice_headers
-        ).json()
 
         # Alice attempts to change ownership to Bob via update
         malicious_update = {
@@ -395,25 +311,22 @@ class TestParameterManipulationAttack:
         assert updated_task["user_id"] != bob["user_id"]
         assert updated_task["title"] == "Updated task"
 
-    def test_sql_injection_in_task_id(self, client, alice_user):
+    @pytest.mark.parametrize("malicious_id", [
+        "1 OR 1=1",
+        "1; DROP TABLE tasks;",
+        "1' OR '1'='1",
+        "1 UNION SELECT * FROM users",
+    ])
+    def test_sql_injection_in_task_id(self, client, alice_headers, malicious_id):
         """Test that SQL injection attempts in task_id are blocked."""
-        alice = alice_user
-        headers = {"Authorization": f"Bearer {alice['token']}"}
+        headers = alice_headers
 
         # Attempt SQL injection in task_id parameter
-        malicious_ids = [
-            "1 OR 1=1",
-            "1; DROP TABLE tasks;",
-            "1' OR '1'='1",
-            "1 UNION SELECT * FROM users",
-        ]
+        response = client.get(f"/tasks/{malicious_id}", headers=headers)
 
-        for malicious_id in malicious_ids:
-            response = client.get(f"/tasks/{malicious_id}", headers=headers)
-
-            # Should return 422 (validation error) or 404 (not found)
-            # Never 200 or 500 (SQL injection succeeded)
-            assert response.status_code in [404, 422]
+        # Should return 422 (validation error) or 404 (not found)
+        # Never 200 or 500 (SQL injection succeeded)
+        assert response.status_code in [404, 422]
 
     def test_header_injection_attack(self, client, alice_user):
         """Test that header injection doesn't bypass authorization."""
@@ -446,20 +359,18 @@ class TestAuthorizationBypass:
         response = client.get("/tasks")
         assert response.status_code == 403
 
-    def test_malformed_token_bypass(self, client):
+    @pytest.mark.parametrize("token", [
+        "Bearer",
+        "Bearer ",
+        "Bearer invalid",
+        "NotBearer token",
+        "",
+    ])
+    def test_malformed_token_bypass(self, client, token):
         """Test that malformed tokens are rejected."""
-        malformed_tokens = [
-            "Bearer",
-            "Bearer ",
-            "Bearer invalid",
-            "NotBearer token",
-            "",
-        ]
-
-        for token in malformed_tokens:
-            headers = {"Authorization": token}
-            response = client.get("/tasks", headers=headers)
-            assert response.status_code in [401, 403]
+        headers = {"Authorization": token}
+        response = client.get("/tasks", headers=headers)
+        assert response.status_code in [401, 403]
 
     def test_null_byte_injection(self, client, alice_user):
         """Test that null byte injection doesn't bypass authorization."""
@@ -6,76 +6,39 @@ from fastapi.testclient import TestClient
 class TestCrossUserAccess:
     """Test that users cannot access other users' tasks."""
 
-    def test_cross_user_get_attempt(self, multi_user_scenario):
-        """Test that Bob cannot GET Alice's task (T015)."""
+    @pytest.mark.parametrize("method,kwargs,action", [
+        ("get", {}, "access"),                                            # T015
+        ("put", {"json": {"title": "Hacked by Bob!", "is_completed": True}}, "update"),  # T016
+        ("delete", {}, "delete"),                                         # T017
+    ])
+    def test_cross_user_forbidden(self, multi_user_scenario, alice_headers,
+                                  bob_headers, method, kwargs, action):
+        """Test that Bob cannot GET/UPDATE/DELETE Alice's task (T015-T017)."""
         scenario = multi_user_scenario
         client = scenario["client"]
         alice_task = scenario["alice_task"]
-        bob = scenario["bob"]
-
-        # Bob attempts to access Alice's task
-        headers = {"Authorization": f"Bearer {bob['token']}"}
-        response = client.get(f"/tasks/{alice_task['id']}", headers=headers)
-
-        # Should return 403 Forbidden
-        assert response.status_code == 403
-        assert "Not authorized to access this task" in response.json()["detail"]
-
-    def test_cross_user_update_attempt(self, multi_user_scenario):
-        """Test that Bob cannot UPDATE Alice's task (T016)."""
-        scenario = multi_user_scenario
-        client = scenario["client"]
-        alice_task = scenario["alice_task"]
-        bob = scenario["bob"]
 
-        # Bob attempts to update Alice's task
-        headers = {"Authorization": f"Bearer {bob['token']}"}
-        update_data = {"title": "Hacked by Bob!", "is_completed": True}
-        response = client.put(
-            f"/tasks/{alice_task['id']}",
-            json=update_data,
-            headers=headers
+        # Bob attempts the operation on Alice's task
+        response = getattr(client, method)(
+            f"/tasks/{alice_task['id']}", headers=bob_headers, **kwargs
         )
 
         # Should return 403 Forbidden
         assert response.status_code == 403
-        assert "Not authorized to update this task" in response.json()["detail"]
+        assert f"Not authorized to {action} this task" in response.json()["error"]["message"]
 
         # Verify Alice's task is unchanged
-        alice = scenario["alice"]
-        alice_headers = {"Authorization": f"Bearer {alice['token']}"}
-        verify_response = client.get(f"/tasks/{alice_task['id']}", headers=alice_headers)
-        assert verify_response.status_code == 200
-        assert verify_response.json()["title"] == alice_task["title"]
-        assert verify_response.json()["is_completed"] == False
-
-    def test_cross_user_delete_attempt(self, multi_user_scenario):
-        """Test that Bob cannot DELETE Alice's task (T017)."""
-        scenario = multi_user_scenario
-        client = scenario["client"]
-        alice_task = scenario["alice_task"]
-        bob = scenario["bob"]
-
-        # Bob attempts to delete Alice's task
-        headers = {"Authorization": f"Bearer {bob['token']}"}
-        response = client.delete(f"/tasks/{alice_task['id']}", headers=headers)
-
-        # Should return 403 Forbidden
-        assert response.status_code == 403
-        assert "Not authorized to delete this task" in response.json()["detail"]
-
-        # Verify Alice's task still exists
-        alice = scenario["alice"]
-        alice_headers = {"Authorization": f"Bearer {alice['token']}"}
         verify_response = client.get(f"/tasks/{alice_task['id']}", headers=alice_headers)
         assert verify_response.status_code == 200
-        assert verify_response.json()["id"] == alice_task["id"]
-
+        verified_task = verify_response.json()
+        assert verified_task["id"] == alice_task["id"]
+        assert verified_task["title"] == alice_task["title"]
+        assert verified_task["is_completed"] == False
 
 class TestTaskListIsolation:
     """Test that task lists are properly isolated per user."""
 
-    def test_task_list_isolation(self, multi_user_scenario):
+    def test_task_list_isolation(self, multi_user_scenario, alice_headers, bob_headers):
         """Test that users only see their own tasks in GET /tasks (T018)."""
         scenario = multi_user_scenario
         client = scenario["client"]
@@ -85,7 +48,6 @@ class TestTaskListIsolation:
         bob_task = scenario["bob_task"]
 
         # Alice gets her task list
-        alice_headers = {"Authorization": f"Bearer {alice['token']}"}
         alice_response = client.get("/tasks", headers=alice_headers)
         assert alice_response.status_code == 200
         alice_tasks = alice_response.json()["tasks"]
@@ -100,7 +62,6 @@ class TestTaskListIsolation:
         assert bob_task["id"] not in alice_task_ids
 
         # Bob gets his task list
-        bob_headers = {"Authorization": f"Bearer {bob['token']}"}
         bob_response = client.get("/tasks", headers=bob_headers)
         assert bob_response.status_code == 200
         bob_tasks = bob_response.json()["tasks"]
@@ -126,20 +87,20 @@ class TestTaskListIsolation:
         headers = {"Authorization": f"Bearer {charlie_token}"}
         response = client.get("/tasks", headers=headers)
         assert response.status_code == 200
-        assert response.json()["total"] == 0
-        assert len(response.json()["tasks"]) == 0
+        body = response.json()
+        assert body["total"] == 0
+        assert len(body["tasks"]) == 0
 
 
 class TestParameterManipulation:
     """Test that parameter manipulation is prevented."""
 
-    def test_parameter_manipulation_prevention(self, client, alice_user, bob_user):
+    def test_parameter_manipulation_prevention(self, client, alice_user, bob_user, alice_headers, bob_headers):
         """Test that user_id in request body is ignored (T019)."""
         alice = alice_user
         bob = bob_user
 
         # Alice attempts to create a task with Bob's user_id in request body
-        alice_headers = {"Authorization": f"Bearer {alice['token']}"}
         malicious_data = {
             "title": "Malicious task",
             "description": "Trying to create task for Bob",
@@ -156,7 +117,6 @@ class TestParameterManipulation:
         assert created_task["user_id"] != bob["user_id"]
 
         # Verify Bob cannot see this task
-        bob_headers = {"Authorization": f"Bearer {bob['token']}"}
         bob_tasks_response = client.get("/tasks", headers=bob_headers)
         bob_task_ids = [task["id"] for task in bob_tasks_response.json()["tasks"]]
         assert created_task["id"] not in bob_task_ids
@@ -170,10 +130,9 @@ class TestParameterManipulation:
 class TestOwnershipVerification:
     """Test ownership verification on all operations."""
 
-    def test_owner_can_access_own_task(self, client, alice_user, alice_task):
+    def test_owner_can_access_own_task(self, client, alice_headers, alice_task):
         """Test that owner can perform all operations on their own task."""
-        alice = alice_user
-        headers = {"Authorization": f"Bearer {alice['token']}"}
+        headers = alice_headers
 
         # GET - should succeed
         get_response = client.get(f"/tasks/{alice_task['id']}", headers=headers)
@@ -188,8 +147,9 @@ class TestOwnershipVerification:
             headers=headers
         )
         assert put_response.status_code == 200
-        assert put_response.json()["title"] == "Updated by Alice"
-        assert put_response.json()["is_completed"] == True
+        updated_task = put_response.json()
+        assert updated_task["title"] == "Updated by Alice"
+        assert updated_task["is_completed"] == True
 
         # DELETE - should succeed
         delete_response = client.delete(f"/tasks/{alice_task['id']}", headers=headers)
@@ -199,62 +159,38 @@ class TestOwnershipVerification:
         verify_response = client.get(f"/tasks/{alice_task['id']}", headers=headers)
         assert verify_response.status_code == 404
 
-    def test_non_existent_task_returns_404(self, client, alice_user):
+    def test_non_existent_task_returns_404(self, client, alice_headers):
         """Test that accessing non-existent task returns 404."""
-        alice = alice_user
-        headers = {"Authorization": f"Bearer {alice['token']}"}
+        headers = alice_headers
         non_existent_id = 99999
 
         # GET non-existent task
         response = client.get(f"/tasks/{non_existent_id}", headers=headers)
         assert response.status_code == 404
-        assert "Task not found" in response.json()["detail"]
+        assert "Task not found" in response.json()["error"]["message"]
 
-    def test_multiple_users_multiple_tasks(self, client):
+    def test_multiple_users_multiple_tasks(self, client, alice_user, bob_user,
+                                           alice_headers, bob_headers, seed_tasks):
         """Test isolation with multiple users and multiple tasks each."""
-        # Create two users
-        alice_creds = {"email": "alice_multi@example.com", "password": "alice123"}
-        bob_creds = {"email": "bob_multi@example.com", "password": "bob123"}
-
-        alice_reg = client.post("/auth/register", json=alice_creds)
-        bob_reg = client.post("/auth/register", json=bob_creds)
-
-        alice_token = alice_reg.json()["access_token"]
-        bob_token = bob_reg.json()["access_token"]
-
-        alice_headers = {"Authorization": f"Bearer {alice_token}"}
-        bob_headers = {"Authorization": f"Bearer {bob_token}"}
-
-        # Alice creates 3 tasks
-        alice_task_ids = []
-        for i in range(3):
-            response = client.post(
-                "/tasks",
-                json={"title": f"Alice task {i+1}"},
-                headers=alice_headers
-            )
-            alice_task_ids.append(response.json()["id"])
-
-        # Bob creates 2 tasks
-        bob_task_ids = []
-        for i in range(2):
-            response = client.post(
-                "/tasks",
-                json={"title": f"Bob task {i+1}"},
-                headers=bob_headers
-            )
-            bob_task_ids.append(response.json()["id"])
+        # Seed 3 tasks for Alice and 2 for Bob directly - the assertions
+        # exercise the read paths, so setup doesn't need the HTTP stack
+        alice_task_ids = seed_tasks(
+            alice_user["user_id"], [f"Alice task {i+1}" for i in range(3)]
+        )
+        bob_task_ids = seed_tasks(
+            bob_user["user_id"], [f"Bob task {i+1}" for i in range(2)]
+        )
 
         # Verify Alice sees only her 3 tasks
-        alice_list = client.get("/tasks", headers=alice_headers)
-        assert alice_list.json()["total"] == 3
-        alice_ids = [task["id"] for task in alice_list.json()["tasks"]]
+        alice_list = client.get("/tasks", headers=alice_headers).json()
+        assert alice_list["total"] == 3
+        alice_ids = [task["id"] for task in alice_list["tasks"]]
         assert set(alice_ids) == set(alice_task_ids)
 
         # Verify Bob sees only his 2 tasks
-        bob_list = client.get("/tasks", headers=bob_headers)
-        assert bob_list.json()["total"] == 2
-        bob_ids = [task["id"] for task in bob_list.json()["tasks"]]
+        bob_list = client.get("/tasks", headers=bob_headers).json()
+        assert bob_list["total"] == 2
+        bob_ids = [task["id"] for task in bob_list["tasks"]]
         assert set(bob_ids) == set(bob_task_ids)
 
         # Verify Bob cannot access any of Alice's tasks
@@ -1,9 +1,34 @@
 """Security tests for JWT token validation."""
+import functools
+
 import pytest
 from datetime import datetime, timedelta
-from jose import jwt
+import jwt
 from src.config import settings
 
+# One clock reading for every token forged in this module
+_TOKEN_EXP = datetime.utcnow() + timedelta(hours=24)
+
+
+@functools.lru_cache(maxsize=32)
+def _wrong_secret_token(user_id):
+    """Token signed with the wrong secret - deterministic, built once per id."""
+    return jwt.encode(
+        {"sub": str(user_id), "exp": _TOKEN_EXP},
+        "wrong_secret_key_12345",
+        algorithm=settings.JWT_ALGORITHM,
+    )
+
+
+@functools.lru_cache(maxsize=32)
+def _wrong_algorithm_token(user_id):
+    """Token signed with HS512 instead of the configured algorithm."""
+    return jwt.encode(
+        {"sub": str(user_id), "exp": _TOKEN_EXP},
+        settings.JWT_SECRET,
+        algorithm="HS512",
+    )
+
 
 class TestMissingAuthentication:
     """Test that missing authentication is properly rejected."""
@@ -15,13 +40,13 @@ class TestMissingAuthentication:
 
         # Should return 403 Forbidden (FastAPI HTTPBearer default)
         assert response.status_code == 403
-        assert "detail" in response.json()
+        assert "error" in response.json()
 
 
 class TestExpiredToken:
     """Test that expired tokens are rejected."""
 
-    def test_expired_token_rejection(self, client, alice_credentials):
+    def test_expired_token_rejection(self, client, alice_credentials, make_token):
         """Test that expired tokens are rejected with specific error (T026)."""
         # Register user first
         register_response = client.post("/auth/register", json=alice_credentials)
@@ -29,15 +54,7 @@ class TestExpiredToken:
         user_id = register_response.json()["user"]["id"]
 
         # Create an expired token (expired 1 hour ago)
-        expired_payload = {
-            "sub": user_id,
-            "exp": datetime.utcnow() - timedelta(hours=1)
-        }
-        expired_token = jwt.encode(
-            expired_payload,
-            settings.JWT_SECRET,
-            algorithm=settings.JWT_ALGORITHM
-        )
+        expired_token = make_token(user_id, timedelta(hours=-1))
 
         # Attempt to use expired token
         headers = {"Authorization": f"Bearer {expired_token}"}
@@ -45,23 +62,15 @@ class TestExpiredToken:
 
         # Should return 401 Unauthorized with specific message
         assert response.status_code == 401
-        assert "Token has expired" in response.json()["detail"]
+        assert "Token has expired" in response.json()["error"]["message"]
 
-    def test_expired_token_on_task_access(self, client, alice_user, alice_task):
+    def test_expired_token_on_task_access(self, client, alice_user, alice_task, make_token):
         """Test that expired tokens are rejected on specific task access."""
         alice = alice_user
         task = alice_task
 
         # Create an expired token for Alice
-        expired_payload = {
-            "sub": alice["user_id"],
-            "exp": datetime.utcnow() - timedelta(hours=1)
-        }
-        expired_token = jwt.encode(
-            expired_payload,
-            settings.JWT_SECRET,
-            algorithm=settings.JWT_ALGORITHM
-        )
+        expired_token = make_token(alice["user_id"], timedelta(hours=-1))
 
         # Attempt to access task with expired token
         headers = {"Authorization": f"Bearer {expired_token}"}
@@ -69,7 +78,7 @@ class TestExpiredToken:
 
         # Should return 401 Unauthorized
         assert response.status_code == 401
-        assert "Token has expired" in response.json()["detail"]
+        assert "Token has expired" in response.json()["error"]["message"]
 
 
 class TestTamperedToken:
@@ -89,7 +98,7 @@ class TestTamperedToken:
 
         # Tamper with payload: change user_id to Bob's
         tampered_payload = alice_payload.copy()
-        tampered_payload["sub"] = bob["user_id"]
+        tampered_payload["sub"] = str(bob["user_id"])
 
         # Re-encode with correct secret (simulating payload tampering)
         # Note: This will fail signature verification because we're changing the payload
@@ -106,7 +115,7 @@ class TestTamperedToken:
 
         # Should return 401 Unauthorized
         assert response.status_code == 401
-        assert response.json()["detail"] in ["Invalid token", "Could not validate credentials"]
+        assert response.json()["error"]["message"] in ["Invalid token", "Could not validate credentials"]
 
     def test_malformed_token_rejection(self, client):
         """Test that malformed tokens are rejected."""
@@ -116,7 +125,7 @@ class TestTamperedToken:
 
         # Should return 401 Unauthorized
         assert response.status_code == 401
-        assert "detail" in response.json()
+        assert "error" in response.json()
 
 
 class TestInvalidSignature:
@@ -130,15 +139,7 @@ class TestInvalidSignature:
         user_id = register_response.json()["user"]["id"]
 
         # Create token with WRONG secret
-        payload = {
-            "sub": user_id,
-            "exp": datetime.utcnow() + timedelta(hours=24)
-        }
-        invalid_token = jwt.encode(
-            payload,
-            "wrong_secret_key_12345",  # Wrong secret
-            algorithm=settings.JWT_ALGORITHM
-        )
+        invalid_token = _wrong_secret_token(user_id)
 
         # Attempt to use token with invalid signature
         headers = {"Authorization": f"Bearer {invalid_token}"}
@@ -146,7 +147,7 @@ class TestInvalidSignature:
 
         # Should return 401 Unauthorized
         assert response.status_code == 401
-        assert "Invalid token" in response.json()["detail"]
+        assert "Invalid token" in response.json()["error"]["message"]
 
     def test_token_with_different_algorithm(self, client, alice_credentials):
         """Test that tokens signed with different algorithm are rejected."""
@@ -156,15 +157,7 @@ class TestInvalidSignature:
         user_id = register_response.json()["user"]["id"]
 
         # Create token with different algorithm (HS512 instead of HS256)
-        payload = {
-            "sub": user_id,
-            "exp": datetime.utcnow() + timedelta(hours=24)
-        }
-        invalid_token = jwt.encode(
-            payload,
-            settings.JWT_SECRET,
-            algorithm="HS512"  # Different algorithm
-        )
+        invalid_token = _wrong_algorithm_token(user_id)
 
         # Attempt to use token with wrong algorithm
         headers = {"Authorization": f"Bearer {invalid_token}"}
@@ -172,29 +165,27 @@ class TestInvalidSignature:
 
         # Should return 401 Unauthorized
         assert response.status_code == 401
-        assert "detail" in response.json()
+        assert "error" in response.json()
 
 
 class TestValidToken:
     """Test that valid tokens are accepted."""
 
-    def test_valid_token_acceptance(self, client, alice_user):
+    def test_valid_token_acceptance(self, client, alice_headers):
         """Test that valid tokens grant access to protected endpoints (T029)."""
-        alice = alice_user
-
         # Use valid token to access protected endpoint
-        headers = {"Authorization": f"Bearer {alice['token']}"}
+        headers = alice_headers
         response = client.get("/tasks", headers=headers)
 
         # Should return 200 OK
         assert response.status_code == 200
-        assert "tasks" in response.json()
-        assert "total" in response.json()
+        body = response.json()
+        assert "tasks" in body
+        assert "total" in body
 
-    def test_valid_token_on_all_operations(self, client, alice_user):
+    def test_valid_token_on_all_operations(self, client, alice_headers):
         """Test that valid tokens work for all CRUD operations."""
-        alice = alice_user
-        headers = {"Authorization": f"Bearer {alice['token']}"}
+        headers = alice_headers
 
         # CREATE - should succeed
         create_response = client.post(
@@ -223,13 +214,12 @@ class TestValidToken:
         delete_response = client.delete(f"/tasks/{task_id}", headers=headers)
         assert delete_response.status_code == 204
 
-    def test_token_user_extraction(self, client, alice_user, bob_user):
+    def test_token_user_extraction(self, client, alice_user, bob_user, alice_headers, bob_headers):
         """Test that tokens correctly identify different users."""
         alice = alice_user
         bob = bob_user
 
         # Alice creates a task
-        alice_headers = {"Authorization": f"Bearer {alice['token']}"}
         alice_task_response = client.post(
             "/tasks",
             json={"title": "Alice's task"},
@@ -239,7 +229,6 @@ class TestValidToken:
         alice_task_id = alice_task_response.json()["id"]
 
         # Bob creates a task
-        bob_headers = {"Authorization": f"Bearer {bob['token']}"}
         bob_task_response = client.post(
             "/tasks",
             json={"title": "Bob's task"},